@@ -5,6 +5,9 @@ from groq import Groq
 from PyPDF2 import PdfReader
 import tempfile
 import json
+import re
+import hashlib
+from question_index import QuestionIndex
 
 # Load environment variables
 load_dotenv()
@@ -17,18 +20,216 @@ if not groq_api_key:
 
 client = Groq(api_key=groq_api_key)
 
-def extract_text_from_pdf(pdf_file):
-    """Extract text from uploaded PDF file"""
+SECTION_KEYWORDS = r"(?:chapter|section|part|appendix)"
+
+# "Section 7: Results", "Chapter IV", "Appendix B"
+KEYWORD_HEADING = re.compile(rf"^{SECTION_KEYWORDS}\s+(\d+(?:\.\d+)*|[IVXLC]+|[A-Z])\b[.:]?\s*(.*)$", re.IGNORECASE)
+# "7 Results", "7.2. Threat Model"
+NUMBERED_HEADING = re.compile(r"^(\d{1,2}(?:\.\d{1,2}){0,2})\.?\s+([A-Z][^.,;:]{2,80})$")
+# A heading's title: capitalised, no sentence punctuation ("Results", not "presents the results.")
+HEADING_TITLE = re.compile(r"^[A-Z][^.,;:]{2,80}$")
+# "Results 4" or "Results .... 4" in a table of contents
+TRAILING_PAGE_NUMBER = re.compile(r"(?:\s|\.)(\d+)$")
+PAGE_SCOPE = re.compile(r"^(?:pages?|pp?\.?)?\s*(\d+)\s*(?:(?:-|–|to)\s*(\d+))?$", re.IGNORECASE)
+
+
+def extract_pdf_document(pdf_file):
+    """Extract per-page text and an outline index from uploaded PDF file"""
     try:
         pdf_reader = PdfReader(pdf_file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text
+        pages = [page.extract_text() for page in pdf_reader.pages]
+        return {
+            "text": "".join(page + "\n" for page in pages),
+            "pages": pages,
+            "outline": build_outline_index(pdf_reader, pages),
+        }
     except Exception as e:
         st.error(f"Error reading PDF: {str(e)}")
         return None
 
+def extract_text_from_pdf(pdf_file):
+    """Extract text from uploaded PDF file"""
+    document = extract_pdf_document(pdf_file)
+    return document["text"] if document else None
+
+def section_number(title):
+    """Return the section number of a heading title ("7.2", "IV", "B"), if any"""
+    match = KEYWORD_HEADING.match(title.strip())
+    if match:
+        return match.group(1).upper()
+    match = NUMBERED_HEADING.match(title.strip())
+    if match:
+        return match.group(1)
+    return None
+
+def _outline_entries_from_bookmarks(pdf_reader):
+    """Flatten PDF bookmarks into (title, level, 0-based page, starts at page top)"""
+    entries = []
+
+    def walk(items, level):
+        for item in items:
+            if isinstance(item, list):
+                walk(item, level + 1)
+                continue
+            try:
+                page = pdf_reader.get_destination_page_number(item)
+            except Exception:
+                continue
+            if page is not None and page >= 0:
+                # Bookmarks rarely say where on the page a section starts
+                entries.append((str(item.title).strip(), level, page, False))
+
+    walk(pdf_reader.outline, 1)
+    return entries
+
+def _heading_title(line):
+    """Return the text after a heading's section number ("Results" for "7 Results")"""
+    match = KEYWORD_HEADING.match(line) or NUMBERED_HEADING.match(line)
+    return match.group(2).strip() if match else ""
+
+def _is_heading_line(line):
+    """True for a short numbered line that reads like a heading rather than a sentence
+
+    "Section 3 presents the results of the survey." starts like a heading but
+    its title is a sentence, so only "Section 3", "Section 3: Results" and
+    the like count.
+    """
+    if len(line) > 80 or section_number(line) is None:
+        return False
+    title = _heading_title(line)
+    return not title or bool(HEADING_TITLE.match(title))
+
+def _ends_in_page_number(line, page_count):
+    """True for lines like "3 Results 4" or "Results .... 4" that end in a page number"""
+    match = TRAILING_PAGE_NUMBER.search(line)
+    return bool(match) and int(match.group(1)) <= page_count
+
+def _is_toc_page(lines, heading_lines, page_count):
+    """True for a table of contents: a page made mostly of headings and lines ending in a page number
+
+    A trailing number on its own is not evidence ("Chapter 2 Phase 1"), so
+    single lines are never dropped for it.
+    """
+    toc_lines = [
+        line_index for line_index, line in enumerate(lines)
+        if line_index in heading_lines or _ends_in_page_number(line, page_count)
+    ]
+    return len(toc_lines) >= 3 and 2 * len(toc_lines) >= len(lines)
+
+def _outline_entries_from_headings(pages):
+    """Detect headings line by line when the PDF has no bookmarks
+
+    Table of contents pages are skipped, as are running headers or footers:
+    numbered lines that open or close most pages with a different number each
+    time ("3 Annual Report", "4 Annual Report", ...). When a section number
+    appears more than once, a line that opens a page or is followed by body
+    text wins over the first one seen.
+    """
+    candidates = []
+    for page_index, page_text in enumerate(pages):
+        lines = [line.strip() for line in (page_text or "").split("\n") if line.strip()]
+        heading_lines = {line_index for line_index, line in enumerate(lines) if _is_heading_line(line)}
+        if _is_toc_page(lines, heading_lines, len(pages)):
+            continue
+        for line_index in sorted(heading_lines):
+            followed_by_body = line_index + 1 < len(lines) and line_index + 1 not in heading_lines
+            candidates.append({
+                "line": lines[line_index],
+                "number": section_number(lines[line_index]),
+                "page": page_index,
+                "opens_page": line_index == 0,
+                "at_edge": line_index in (0, len(lines) - 1),
+                "preferred": line_index == 0 or followed_by_body,
+            })
+
+    edge_pages_by_title = {}
+    edge_numbers_by_title = {}
+    for candidate in candidates:
+        title = _heading_title(candidate["line"]).lower()
+        if title and candidate["at_edge"]:
+            edge_pages_by_title.setdefault(title, set()).add(candidate["page"])
+            edge_numbers_by_title.setdefault(title, set()).add(candidate["number"])
+    running_titles = {
+        title for title, title_pages in edge_pages_by_title.items()
+        if len(title_pages) >= 2 and 2 * len(title_pages) > len(pages) and len(edge_numbers_by_title[title]) > 1
+    }
+
+    chosen = {}
+    for candidate in candidates:
+        if candidate["at_edge"] and _heading_title(candidate["line"]).lower() in running_titles:
+            continue
+        current = chosen.get(candidate["number"])
+        if current is None or (candidate["preferred"] and not current["preferred"]):
+            chosen[candidate["number"]] = candidate
+
+    return [
+        (candidate["line"], candidate["number"].count(".") + 1, candidate["page"], candidate["opens_page"])
+        for candidate in chosen.values()
+    ]
+
+def build_outline_index(pdf_reader, pages):
+    """Map sections to 1-based inclusive page ranges from bookmarks or detected headings"""
+    try:
+        entries = _outline_entries_from_bookmarks(pdf_reader)
+    except Exception:
+        entries = []
+    if not entries:
+        entries = _outline_entries_from_headings(pages)
+    entries.sort(key=lambda entry: entry[2])
+
+    outline = []
+    for i, (title, level, page, _) in enumerate(entries):
+        # A section runs until the next heading at the same or a higher level
+        end_page = len(pages) - 1
+        for next_title, next_level, next_page, next_at_top in entries[i + 1:]:
+            if next_level <= level:
+                end_page = next_page - 1 if next_at_top and next_page > page else next_page
+                break
+        outline.append({
+            "title": title,
+            "number": section_number(title),
+            "level": level,
+            "start_page": page + 1,
+            "end_page": end_page + 1,
+        })
+    return outline
+
+def resolve_scope(scope, page_count, outline):
+    """Turn "pages 40-55", "page 3", "Section 7" or a section title into a page range
+
+    Returns (start_page, end_page, label) with 1-based inclusive pages, or None
+    if the scope does not match any pages or section.
+    """
+    scope = scope.strip()
+    match = PAGE_SCOPE.match(scope)
+    if match:
+        start = int(match.group(1))
+        end = int(match.group(2) or start)
+        if start > end:
+            start, end = end, start
+        if start < 1 or start > page_count:
+            return None
+        end = min(end, page_count)
+        return start, end, _page_label(start, end)
+
+    number = section_number(scope)
+    query = scope.lower()
+    for entry in outline:
+        if number is not None and entry["number"] == number:
+            break
+        if number is None and query in entry["title"].lower():
+            break
+    else:
+        return None
+    return entry["start_page"], entry["end_page"], f"{entry['title']} ({_page_label(entry['start_page'], entry['end_page'])})"
+
+def _page_label(start_page, end_page):
+    return f"page {start_page}" if start_page == end_page else f"pages {start_page}-{end_page}"
+
+def get_scoped_text(pages, start_page, end_page):
+    """Join the text of a 1-based inclusive page range"""
+    return "".join(page + "\n" for page in pages[start_page - 1:end_page])
+
 def ask_groq_question(context, question, model="llama3-8b-8192"):
     """Ask a question to Groq API based on the PDF context"""
     try:
@@ -202,6 +403,7 @@ def main():
         st.markdown("### 🛡️ Hallucination Prevention")
         use_confidence = st.checkbox("Show confidence scores", value=True, help="LLM rates its own confidence in the answer")
         use_sources = st.checkbox("Show source citations", value=True, help="Show exact text that supports the answer")
+        reuse_similar = st.checkbox("Reuse answers to similar questions", value=True, help="Answer a rephrased question from chat history instead of asking Groq again")
         
         if use_confidence:
             st.info("""
@@ -239,17 +441,27 @@ def main():
             
             # Extract text from PDF
             with st.spinner("Extracting text from PDF..."):
-                pdf_text = extract_text_from_pdf(uploaded_file)
+                pdf_document = extract_pdf_document(uploaded_file)
             
+            pdf_text = pdf_document["text"] if pdf_document else None
             if pdf_text:
                 # Store in session state
                 st.session_state['pdf_text'] = pdf_text
+                st.session_state['pdf_pages'] = pdf_document["pages"]
+                st.session_state['pdf_outline'] = pdf_document["outline"]
                 st.session_state['pdf_name'] = uploaded_file.name
                 
                 # Show text preview
                 with st.expander("📖 PDF Text Preview (first 500 characters)"):
                     st.text(pdf_text[:500] + "..." if len(pdf_text) > 500 else pdf_text)
                 
+                # Show outline so users know which sections they can scope to
+                if pdf_document["outline"]:
+                    with st.expander(f"📑 Document Outline ({len(pdf_document['outline'])} sections)"):
+                        for entry in pdf_document["outline"]:
+                            indent = "&nbsp;" * 4 * (entry["level"] - 1)
+                            st.markdown(f"{indent}{entry['title']} — {_page_label(entry['start_page'], entry['end_page'])}")
+                
                 st.success(f"✅ Extracted {len(pdf_text)} characters from PDF")
             else:
                 st.error("❌ Failed to extract text from PDF")
@@ -269,13 +481,52 @@ def main():
                 height=100
             )
             
+            # Optional scope so only the relevant pages are sent
+            scope = st.text_input(
+                "Limit to a section or pages (optional):",
+                placeholder="Section 7, pages 40-55, or a section title",
+                help="Only the matching pages are sent to Groq, which is faster and cheaper on long documents"
+            )
+            
+            context = st.session_state['pdf_text']
+            scope_label = None
+            scope_found = True
+            if scope.strip():
+                page_range = resolve_scope(scope, len(st.session_state['pdf_pages']), st.session_state['pdf_outline'])
+                if page_range:
+                    start_page, end_page, scope_label = page_range
+                    context = get_scoped_text(st.session_state['pdf_pages'], start_page, end_page)
+                    st.caption(f"📑 Asking about {scope_label}: {len(context)} of {len(st.session_state['pdf_text'])} characters")
+                else:
+                    scope_found = False
+            
             if st.button("🚀 Ask Groq", type="primary"):
-                if question.strip():
+                if not scope_found:
+                    st.error("❌ Could not find that section or page range in the document")
+                elif question.strip():
+                    if use_confidence and use_sources:
+                        answer_type = 'confidence_and_sources'
+                    elif use_confidence:
+                        answer_type = 'confidence'
+                    elif use_sources:
+                        answer_type = 'sources'
+                    else:
+                        answer_type = 'basic'
+                    
+                    # Answered questions are indexed per context, model and answer type
+                    if 'question_indexes' not in st.session_state:
+                        st.session_state['question_indexes'] = {}
+                    index_key = (hashlib.sha256(context.encode("utf-8")).hexdigest(), model, answer_type)
+                    question_index = st.session_state['question_indexes'].setdefault(index_key, QuestionIndex())
+                    match = question_index.find(question) if reuse_similar else None
+                    if match:
+                        st.info(f"♻️ Reused the answer to a similar question: \"{match['question']}\" (similarity {match['similarity']:.2f})")
+                    
                     with st.spinner("🤔 Thinking..."):
                         if use_confidence and use_sources:
                             # Use both confidence and sources
-                            result = ask_groq_with_sources(
-                                st.session_state['pdf_text'],
+                            result = match["answer"] if match else ask_groq_with_sources(
+                                context,
                                 question,
                                 model
                             )
@@ -302,8 +553,8 @@ def main():
                         
                         elif use_confidence:
                             # Use confidence scoring only
-                            result = ask_groq_with_confidence(
-                                st.session_state['pdf_text'],
+                            result = match["answer"] if match else ask_groq_with_confidence(
+                                context,
                                 question,
                                 model
                             )
@@ -325,8 +576,8 @@ def main():
                         
                         elif use_sources:
                             # Use source citations only
-                            result = ask_groq_with_sources(
-                                st.session_state['pdf_text'],
+                            result = match["answer"] if match else ask_groq_with_sources(
+                                context,
                                 question,
                                 model
                             )
@@ -343,14 +594,22 @@ def main():
                         
                         else:
                             # Use basic approach
-                            answer = ask_groq_question(
-                                st.session_state['pdf_text'],
+                            answer = match["answer"] if match else ask_groq_question(
+                                context,
                                 question,
                                 model
                             )
                             st.markdown("### 💡 Answer")
                             st.write(answer)
                     
+                    # Index new answers so rephrased questions can reuse them
+                    if not match:
+                        if answer_type == 'basic':
+                            if not answer.startswith("Error:"):
+                                question_index.add(question, answer)
+                        elif result["confidence"] != "ERROR":
+                            question_index.add(question, result)
+                    
                     # Store in chat history
                     if 'chat_history' not in st.session_state:
                         st.session_state['chat_history'] = []
@@ -363,6 +622,8 @@ def main():
                             'confidence': result["confidence"],
                             'sources': result["sources"],
                             'model': model,
+                            'scope': scope_label,
+                            'reused_from': match['question'] if match else None,
                             'type': 'confidence_and_sources'
                         })
                     elif use_confidence:
@@ -372,6 +633,8 @@ def main():
                             'confidence': result["confidence"],
                             'reasoning': result["reasoning"],
                             'model': model,
+                            'scope': scope_label,
+                            'reused_from': match['question'] if match else None,
                             'type': 'confidence'
                         })
                     elif use_sources:
@@ -381,6 +644,8 @@ def main():
                             'sources': result["sources"],
                             'confidence': result["confidence"],
                             'model': model,
+                            'scope': scope_label,
+                            'reused_from': match['question'] if match else None,
                             'type': 'sources'
                         })
                     else:
@@ -388,6 +653,8 @@ def main():
                             'question': question,
                             'answer': answer,
                             'model': model,
+                            'scope': scope_label,
+                            'reused_from': match['question'] if match else None,
                             'type': 'basic'
                         })
                 else:
@@ -432,7 +699,12 @@ def main():
                                 st.markdown("**📚 Sources:**")
                                 st.markdown(chat['sources'])
                         
-                        st.caption(f"Model: {chat['model']}")
+                        if chat.get('scope'):
+                            st.caption(f"Model: {chat['model']} · Scope: {chat['scope']}")
+                        else:
+                            st.caption(f"Model: {chat['model']}")
+                        if chat.get('reused_from'):
+                            st.caption(f"♻️ Reused answer to: {chat['reused_from']}")
                         
                         if st.button(f"🗑️ Delete", key=f"delete_{i}"):
                             st.session_state['chat_history'].pop(-(i+1))
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Offline stand-ins for the load test and the offline test scripts
+
+FakeGroqClient replaces app.client so no Groq calls or API key are needed,
+and make_pdf builds small text PDFs to upload.
+"""
+
+import random
+import threading
+import time
+import types
+
+
+class FakeGroqClient:
+    """Stands in for groq.Groq with lognormal latency and well-formed answers"""
+
+    def __init__(self, median_latency=0.4, sigma=0.5, seconds_per_1k_tokens=0.02, seed=None):
+        self.median_latency = median_latency
+        self.sigma = sigma
+        self.seconds_per_1k_tokens = seconds_per_1k_tokens
+        self.random = random.Random(seed)
+        self.calls = 0
+        # create() runs on the service's executor threads
+        self.lock = threading.Lock()
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+
+    def create(self, messages, model, temperature=0.0, max_tokens=1024, **kwargs):
+        with self.lock:
+            self.calls += 1
+        prompt_tokens = sum(len(message["content"]) for message in messages) / 4
+        # Network and queueing noise is long-tailed, prompt processing is roughly linear
+        latency = self.random.lognormvariate(0, self.sigma) * self.median_latency
+        latency += prompt_tokens / 1000 * self.seconds_per_1k_tokens
+        time.sleep(latency)
+
+        content = (
+            "ANSWER: The document reviews quarterly results and security controls.\n"
+            "SOURCES: The committee reviewed the quarterly results and the security controls in place.\n"
+            "CONFIDENCE: HIGH\n"
+            "REASONING: This is clearly stated in the text."
+        )
+        message = types.SimpleNamespace(content=content)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+def make_pdf(pages):
+    """Build a minimal text PDF, one string per page (newlines start new lines), without extra dependencies"""
+    page_count = len(pages)
+    font_id = 3 + 2 * page_count
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            " ".join(f"{3 + 2 * i} 0 R" for i in range(page_count)), page_count
+        ),
+    ]
+    for i, text in enumerate(pages):
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>"
+        )
+        lines = [
+            paragraph[start:start + 90]
+            for paragraph in text.split("\n")
+            for start in range(0, max(len(paragraph), 1), 90)
+        ]
+        stream = "BT /F1 10 Tf 14 TL 40 750 Td " + " ".join(
+            "({}) '".format(line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")) for line in lines
+        ) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        pdf += f"{offset:010d} 00000 n \n".encode()
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return pdf
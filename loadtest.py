@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Load test for PDF Question Answering with Groq
+
+Simulates concurrent analyst sessions (upload -> ask -> follow-up) against the
+QAService layer with an offline fake Groq backend, ramping the number of
+sessions and writing a JSON report that can be compared between releases.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import time
+
+from fake_groq import FakeGroqClient, make_pdf
+
+STAGES = ["upload", "ask", "follow_up"]
+
+FILLER = (
+    "The committee reviewed the quarterly results and the security controls in place. "
+    "Revenue grew in every region while incident response times continued to improve. "
+)
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def current_rss_kb():
+    """Resident memory of this process in KB"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        # No /proc (e.g. macOS): fall back to the peak, in bytes there
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if sys.platform == "darwin" else peak
+
+
+async def run_stage(stats, stage, call, think_time):
+    """Time one session stage, retrying with backoff while the service is saturated"""
+    from service import QueueFullError
+
+    start = time.perf_counter()
+    backoff = 0.05
+    while True:
+        try:
+            result = await call()
+            break
+        except QueueFullError:
+            stats["rejections"][stage] += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 1.0)
+    stats["latencies"][stage].append(time.perf_counter() - start)
+    await asyncio.sleep(random.uniform(0, 2 * think_time))
+    return result
+
+
+async def run_session(qa_service, session_id, stats, args):
+    """One analyst: upload a document, ask a question, then a follow-up"""
+    pages = [f"Report {session_id} page {page + 1}. " + FILLER * 6 for page in range(args.pages)]
+    pdf_bytes = make_pdf(pages)
+
+    async def upload():
+        return await qa_service.add_document(pdf_bytes)
+
+    doc_id = await run_stage(stats, "upload", upload, args.think_time)
+    if doc_id is None:
+        stats["errors"] += 1
+        return
+
+    for stage, question in [
+        ("ask", f"What is the main topic of report {session_id}?"),
+        ("follow_up", f"What did the committee conclude in report {session_id}?"),
+    ]:
+        async def ask():
+            waiters = qa_service.enqueue_questions(doc_id, [question], mode=args.mode)
+            return await waiters[0]
+
+        result = await run_stage(stats, stage, ask, args.think_time)
+        if result["confidence"] == "ERROR":
+            stats["errors"] += 1
+
+
+async def run_level(sessions, args, client):
+    """Run one concurrency level on a fresh service and summarise it, counting calls to client"""
+    from service import QAService
+
+    qa_service = QAService(workers=args.workers, queue_size=args.queue_size, max_documents=max(sessions, 1))
+    stats = {
+        "latencies": {stage: [] for stage in STAGES},
+        "rejections": {stage: 0 for stage in STAGES},
+        "errors": 0,
+    }
+    calls_before = client.calls
+    rss_before = current_rss_kb()
+
+    await qa_service.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(run_session(qa_service, i, stats, args) for i in range(sessions)))
+    elapsed = time.perf_counter() - start
+    await qa_service.stop()
+
+    rss_after = current_rss_kb()
+    questions = len(stats["latencies"]["ask"]) + len(stats["latencies"]["follow_up"])
+    return {
+        "sessions": sessions,
+        "elapsed_s": round(elapsed, 3),
+        "questions": questions,
+        "llm_calls": client.calls - calls_before,
+        "throughput_qps": round(questions / elapsed, 3) if elapsed else None,
+        "errors": stats["errors"],
+        "rejections": stats["rejections"],
+        "rejection_rate": rejection_rates(stats),
+        "latency_s": {
+            stage: {
+                "p50": _round(percentile(values, 50)),
+                "p90": _round(percentile(values, 90)),
+                "p99": _round(percentile(values, 99)),
+                "max": _round(max(values) if values else None),
+            }
+            for stage, values in stats["latencies"].items()
+        },
+        "memory_kb": {"start": rss_before, "end": rss_after, "growth": rss_after - rss_before},
+    }
+
+
+def rejection_rates(stats):
+    """Share of attempts per stage (and overall) that the service rejected with QueueFullError"""
+    rates = {}
+    for stage in STAGES + ["total"]:
+        stages = STAGES if stage == "total" else [stage]
+        rejected = sum(stats["rejections"][name] for name in stages)
+        attempts = rejected + sum(len(stats["latencies"][name]) for name in stages)
+        rates[stage] = round(rejected / attempts, 4) if attempts else 0.0
+    return rates
+
+
+def _round(value):
+    return None if value is None else round(value, 4)
+
+
+def find_saturation(levels, p99_budget, min_gain, max_rejection_rate=0.0):
+    """First level where requests are rejected, throughput stops scaling or ask p99 exceeds the budget"""
+    previous = None
+    for level in levels:
+        rejection_rate = level["rejection_rate"]["total"]
+        if rejection_rate > max_rejection_rate:
+            return {
+                "sessions": level["sessions"],
+                "reason": f"rejection rate {rejection_rate} exceeds budget {max_rejection_rate}",
+            }
+        p99 = level["latency_s"]["ask"]["p99"]
+        if p99 is not None and p99 > p99_budget:
+            return {"sessions": level["sessions"], "reason": f"ask p99 {p99}s exceeds budget {p99_budget}s"}
+        if previous and level["throughput_qps"] < previous["throughput_qps"] * (1 + min_gain):
+            return {
+                "sessions": level["sessions"],
+                "reason": f"throughput {level['throughput_qps']} qps vs {previous['throughput_qps']} qps "
+                          f"at {previous['sessions']} sessions",
+            }
+        previous = level
+    return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the PDF Q&A service layer with a fake Groq backend")
+    parser.add_argument("--sessions", default="1,4,16,64,128", help="Comma-separated concurrency levels to ramp through")
+    parser.add_argument("--workers", type=int, default=32, help="QAService worker count")
+    parser.add_argument("--queue-size", type=int, default=256, help="QAService queue size")
+    parser.add_argument("--mode", default="sources", choices=["basic", "confidence", "sources"])
+    parser.add_argument("--pages", type=int, default=5, help="Pages per generated PDF")
+    parser.add_argument("--think-time", type=float, default=0.5, help="Mean pause between session stages (seconds)")
+    parser.add_argument("--median-latency", type=float, default=0.4, help="Median fake LLM latency (seconds)")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Lognormal sigma of the fake LLM latency")
+    parser.add_argument("--p99-budget", type=float, default=5.0, help="Ask p99 (seconds) that counts as saturated")
+    parser.add_argument("--max-rejection-rate", type=float, default=0.0,
+                        help="Share of attempts rejected with 429 that counts as saturated")
+    parser.add_argument("--min-gain", type=float, default=0.1, help="Throughput gain below which a level counts as saturated")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to this file as well as stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    random.seed(args.seed)
+    # app.py needs an API key at import time; the fake backend never uses it
+    os.environ.setdefault("GROQ_API_KEY", "offline-load-test")
+    import app
+
+    app.client = FakeGroqClient(args.median_latency, args.latency_sigma, seed=args.seed)
+
+    levels = []
+    for sessions in [int(value) for value in args.sessions.split(",")]:
+        print(f"🔄 Running {sessions} sessions...", file=sys.stderr)
+        levels.append(asyncio.run(run_level(sessions, args, app.client)))
+
+    report = {
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "levels": levels,
+        "saturation_point": find_saturation(levels, args.p99_budget, args.min_gain, args.max_rejection_rate),
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    return report
+
+
+if __name__ == "__main__":
+    main()
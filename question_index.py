@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate question matching for PDF Question Answering with Groq
+
+Questions are embedded offline as hashed word and character n-gram vectors
+and compared with NumPy cosine similarity, so paraphrases of a question that
+was already answered ("what's the doc about" / "main topic of this
+document?") can reuse the stored answer instead of calling Groq again.
+"""
+
+import re
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+EMBEDDING_DIM = 4096
+
+# Best F0.5 on the "tune" pairs in paraphrase_pairs.jsonl; precision and
+# recall are reported on the "holdout" pairs by test_question_matching.py
+DEFAULT_THRESHOLD = 0.69
+
+STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "for", "to", "from", "by", "with", "and", "or", "at", "as",
+    "is", "are", "was", "were", "be", "been", "do", "does", "did", "can", "could", "would", "will",
+    "you", "me", "i", "we", "us", "please", "tell", "give", "explain", "describe", "show", "say", "said",
+    "this", "that", "these", "those", "it", "its", "there", "here", "which", "any", "some", "all",
+    "what", "whats", "according", "mentioned", "mention", "stated", "state", "listed", "list",
+    "provided", "given", "document", "main", "exactly", "briefly", "specifically",
+}
+
+# Canonical forms for words that are often swapped in questions about a document.
+# "document" and "main" are then dropped as stopwords: every question is about
+# the document, and "main findings" asks the same thing as "findings".
+SYNONYMS = {
+    "doc": "document", "pdf": "document", "paper": "document", "report": "document", "file": "document",
+    "text": "document", "article": "document",
+    "about": "topic", "topic": "topic", "subject": "topic", "theme": "topic", "focus": "topic",
+    "main": "main", "primary": "main", "central": "main", "principal": "main", "major": "main",
+    "summary": "summary", "summarize": "summary", "summarise": "summary", "overview": "summary",
+    "gist": "summary", "recap": "summary", "tldr": "summary",
+    "author": "author", "writer": "author", "wrote": "author",
+    "conclusion": "conclusion", "conclude": "conclusion", "concluded": "conclusion",
+    "takeaway": "conclusion", "outcome": "conclusion",
+    "finding": "finding", "result": "finding",
+    "date": "date", "when": "date",
+    "method": "method", "methodology": "method", "approach": "method", "technique": "method",
+    "cost": "cost", "price": "cost", "spend": "cost", "spent": "cost", "expense": "cost",
+    "revenue": "revenue", "sale": "revenue",
+    "risk": "risk", "threat": "risk", "danger": "risk",
+    "recommend": "recommendation", "recommendation": "recommendation", "suggest": "recommendation",
+    "suggestion": "recommendation", "advice": "recommendation",
+    "goal": "goal", "objective": "goal", "aim": "goal",
+    "who": "who", "whom": "who", "person": "who", "people": "who",
+    "where": "where", "location": "where", "located": "where",
+    "why": "why", "reason": "why",
+    "many": "count", "count": "count", "much": "count",
+}
+
+CANONICAL_WORDS = set(SYNONYMS.values())
+
+CONTRACTIONS = {
+    "what's": "what is", "whats": "what is", "who's": "who is", "where's": "where is", "how's": "how is",
+    "isn't": "is not", "aren't": "are not", "doesn't": "does not", "don't": "do not", "didn't": "did not",
+    "can't": "cannot", "won't": "will not", "wasn't": "was not", "weren't": "were not",
+}
+
+NEGATIONS = {"not", "no", "never", "cannot", "without", "nor"}
+
+# "phase one", "the first phase" and "phase 1st" all become "1"
+NUMBER_WORDS = {
+    "one": "1", "two": "2", "three": "3", "four": "4", "five": "5", "six": "6",
+    "seven": "7", "eight": "8", "nine": "9", "ten": "10", "eleven": "11", "twelve": "12",
+    "first": "1", "second": "2", "third": "3", "fourth": "4", "fifth": "5", "sixth": "6",
+    "seventh": "7", "eighth": "8", "ninth": "9", "tenth": "10", "eleventh": "11", "twelfth": "12",
+}
+ORDINAL = re.compile(r"^(\d+)(?:st|nd|rd|th)$")
+
+# "this year" and "last year" ask about different periods; only counted before a unit of time
+TIME_REFERENCES = {
+    "this": "this", "current": "this", "last": "last", "previous": "last", "prior": "last", "past": "last",
+    "next": "next", "coming": "next", "upcoming": "next", "following": "next",
+}
+TIME_UNITS = {
+    "year", "quarter", "month", "week", "day", "period", "season", "decade", "term", "half", "fiscal", "fy",
+    "cycle", "round", "phase", "release", "version",
+}
+
+# "how much" and "how many" ask for a quantity like "what"; any other "how" asks for a way of doing something
+QUANTITY_WORDS = {"much", "many", "long", "old", "big", "large", "often", "far"}
+
+# Words that change which answer a question needs, besides numbers, identifiers and negation
+SIGNATURE_WORDS = {"this", "last", "next", "how"}
+
+TOKEN = re.compile(r"[A-Za-z0-9]+(?:'[A-Za-z]+)?")
+
+
+def _stem(word):
+    """Strip common English suffixes so "findings" and "finding" match"""
+    for suffix in ("ies", "ing", "ed", "es", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            if suffix == "ies":
+                word += "y"
+            break
+    return word
+
+
+def _split_words(question):
+    """Lowercase words with contractions expanded
+
+    A single capital letter after the first word ("option A", "Plan B's")
+    is an identifier, not the article, and becomes "#a".
+    """
+    words = []
+    for position, token in enumerate(TOKEN.findall(question.replace("’", "'"))):
+        letter = token.split("'")[0]
+        if position and len(letter) == 1 and letter.isupper() and letter != "I":
+            words.append(f"#{letter.lower()}")
+            continue
+        words += [word.replace("'", "") for word in CONTRACTIONS.get(token.lower(), token.lower()).split()]
+    return words
+
+
+def normalize_question(question):
+    """Lowercase, expand contractions, canonicalise synonyms and numbers and drop filler words"""
+    words = []
+    raw_words = _split_words(question)
+    for position, word in enumerate(raw_words):
+        following = raw_words[position + 1] if position + 1 < len(raw_words) else ""
+        if word.startswith("#"):
+            words.append(word)
+        elif word in NEGATIONS:
+            words.append("not")
+        elif word in TIME_REFERENCES and _stem(following) in TIME_UNITS:
+            words.append(TIME_REFERENCES[word])
+        elif word == "how":
+            if following not in QUANTITY_WORDS:
+                words.append("how")
+        else:
+            ordinal = ORDINAL.match(word)
+            word = ordinal.group(1) if ordinal else NUMBER_WORDS.get(word, word)
+            word = SYNONYMS.get(word, SYNONYMS.get(_stem(word), word))
+            if word in STOPWORDS:
+                continue
+            words.append(word if word in CANONICAL_WORDS else _stem(word))
+    return words
+
+
+def _bucket(feature):
+    """Stable hash of a feature to a signed vector index"""
+    hashed = zlib.crc32(feature.encode("utf-8"))
+    return hashed % EMBEDDING_DIM, 1.0 if hashed & 0x80000000 else -1.0
+
+
+def embed_question(question):
+    """Embed a question as an L2-normalised hashed n-gram vector"""
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    words = normalize_question(question)
+    features = [(f"w:{word}", 1.0) for word in words]
+    features += [(f"b:{first} {second}", 0.5) for first, second in zip(words, words[1:])]
+    # Character trigrams catch typos and word forms the stemmer misses
+    for word in words:
+        padded = f"<{word}>"
+        features += [(f"c:{padded[i:i + 3]}", 0.25) for i in range(len(padded) - 2)]
+
+    for feature, weight in features:
+        index, sign = _bucket(feature)
+        vector[index] += sign * weight
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def question_signature(question):
+    """Words that must agree for two questions to match
+
+    "revenue in 2022" and "revenue in 2023", "option A" and "option B",
+    "last year" and "this year", or "what are the risks" and "how can we
+    reduce the risks" embed almost identically but need different answers,
+    so numbers, identifiers, time references, "how" and negation all have to
+    be the same.
+    """
+    words = normalize_question(question)
+    markers = frozenset(
+        word for word in words
+        if word in SIGNATURE_WORDS or word.startswith("#") or any(char.isdigit() for char in word)
+    )
+    return markers, "not" in words
+
+
+def question_similarity(first, second):
+    """Cosine similarity of two questions, 0.0 if their signatures differ"""
+    if question_signature(first) != question_signature(second):
+        return 0.0
+    return float(embed_question(first) @ embed_question(second))
+
+
+class QuestionIndex:
+    """Answered questions for one document, searchable by cosine similarity
+
+    Vectors live in a preallocated array that grows by doubling up to
+    max_entries and is then reused as a ring buffer, so adding or removing a
+    question never copies the whole index.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, max_entries=1000):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.vectors = np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        # One entry per row of self.vectors in use, None for rows freed by remove()
+        self.entries = []
+        self.free_rows = []
+        # Rows in insertion order, oldest first, to pick the row to overwrite when full
+        self.order = OrderedDict()
+
+    def __len__(self):
+        return len(self.order)
+
+    def _next_row(self):
+        """Row for a new entry: a freed row, a new row, or the oldest entry's row"""
+        if self.free_rows:
+            return self.free_rows.pop()
+        if len(self.entries) < self.max_entries:
+            row = len(self.entries)
+            if row == len(self.vectors):
+                capacity = min(max(16, 2 * len(self.vectors)), self.max_entries)
+                grown = np.zeros((capacity, EMBEDDING_DIM), dtype=np.float32)
+                grown[:row] = self.vectors
+                self.vectors = grown
+            self.entries.append(None)
+            return row
+        row, _ = self.order.popitem(last=False)
+        return row
+
+    def add(self, question, answer):
+        """Store an answered question, overwriting the oldest past max_entries"""
+        row = self._next_row()
+        self.vectors[row] = embed_question(question)
+        self.entries[row] = {
+            "question": question,
+            "answer": answer,
+            "signature": question_signature(question),
+        }
+        self.order[row] = None
+
+    def remove(self, answer):
+        """Drop every entry whose stored answer equals answer"""
+        for row, entry in enumerate(self.entries):
+            if entry is not None and entry["answer"] == answer:
+                self.entries[row] = None
+                self.vectors[row] = 0.0
+                self.free_rows.append(row)
+                del self.order[row]
+
+    def find(self, question, threshold=None):
+        """Return the most similar answered question above the threshold, or None"""
+        if not self.order:
+            return None
+        threshold = self.threshold if threshold is None else threshold
+        scores = self.vectors[:len(self.entries)] @ embed_question(question)
+        signature = question_signature(question)
+        for index in np.argsort(-scores):
+            if scores[index] < threshold:
+                break
+            entry = self.entries[index]
+            if entry is not None and entry["signature"] == signature:
+                return {"question": entry["question"], "answer": entry["answer"], "similarity": float(scores[index])}
+        return None
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+HTTP service for PDF Question Answering with Groq
+
+Exposes the same extraction and ask_groq_* logic as the Streamlit app to
+programmatic clients. Questions are answered by a fixed pool of async workers
+that share one document store and one answer cache; when the request queue is
+full the service answers 429 instead of piling up work.
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from app import (
+    extract_pdf_document,
+    resolve_scope,
+    get_scoped_text,
+    ask_groq_question,
+    ask_groq_with_confidence,
+    ask_groq_with_sources,
+)
+from question_index import DEFAULT_THRESHOLD, QuestionIndex
+
+DEFAULT_MODEL = "llama3-8b-8192"
+
+MAX_BATCH_SIZE = int(os.getenv("QA_MAX_BATCH", "64"))
+MAX_UPLOAD_BYTES = int(float(os.getenv("QA_MAX_UPLOAD_MB", "50")) * 1024 * 1024)
+
+# Answer modes, named after the chat history types used in the app
+ASK_FUNCTIONS = {
+    "basic": ask_groq_question,
+    "confidence": ask_groq_with_confidence,
+    "sources": ask_groq_with_sources,
+}
+
+
+class QueueFullError(Exception):
+    """Raised when the request queue cannot take more questions"""
+
+
+class BatchTooLargeError(Exception):
+    """Raised when a batch could never fit in the request queue"""
+
+
+class ScopeNotFoundError(Exception):
+    """Raised when a section or page scope does not match the document"""
+
+
+class QAService:
+    """Document store, answer cache and worker pool shared by all clients"""
+
+    def __init__(self, workers=32, queue_size=256, max_documents=100, max_answers=10000,
+                 similarity_threshold=DEFAULT_THRESHOLD):
+        self.worker_count = workers
+        self.queue_size = queue_size
+        self.max_documents = max_documents
+        self.max_answers = max_answers
+        self.similarity_threshold = similarity_threshold
+        self.documents = OrderedDict()
+        self.answers = OrderedDict()
+        # Answered questions per (doc_id, page_range, model, mode), for paraphrase lookups
+        self.question_indexes = {}
+        self.pending = {}
+        self.queue = None
+        self.executor = None
+        self.workers = []
+
+    async def start(self):
+        """Start the worker tasks on the running event loop"""
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        # The Groq client is blocking, so each worker owns one executor thread
+        self.executor = ThreadPoolExecutor(max_workers=self.worker_count)
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+    async def stop(self):
+        """Cancel the workers and release the executor"""
+        for task in self.workers:
+            task.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def add_document(self, pdf_bytes):
+        """Extract and store a PDF with its outline, returning its content-hash id"""
+        doc_id = hashlib.sha256(pdf_bytes).hexdigest()
+        if doc_id in self.documents:
+            self.documents.move_to_end(doc_id)
+            return doc_id
+
+        loop = asyncio.get_running_loop()
+        document = await loop.run_in_executor(self.executor, extract_pdf_document, io.BytesIO(pdf_bytes))
+        if not document or not document["text"]:
+            return None
+
+        self.documents[doc_id] = document
+        while len(self.documents) > self.max_documents:
+            evicted_id, _ = self.documents.popitem(last=False)
+            for index_key in [index_key for index_key in self.question_indexes if index_key[0] == evicted_id]:
+                del self.question_indexes[index_key]
+        return doc_id
+
+    def enqueue_questions(self, doc_id, questions, model=DEFAULT_MODEL, mode="sources", scope=None,
+                          reuse_similar=True):
+        """Queue questions for the workers and return one awaitable per question
+
+        Either every question is accepted or QueueFullError is raised, so a
+        batch is never half-queued. A batch with more new questions than the
+        whole queue raises BatchTooLargeError, since retrying cannot help. Cached answers, paraphrases of answered
+        questions (unless reuse_similar is False) and questions already being
+        answered do not take a queue slot. An optional scope ("Section 7",
+        "pages 40-55") limits the context to those pages.
+        """
+        loop = asyncio.get_running_loop()
+        document = self.documents[doc_id]
+        # Documents are evicted least recently used, and asking counts as a use
+        self.documents.move_to_end(doc_id)
+        context = document["text"]
+        page_range = None
+        if scope and scope.strip():
+            resolved = resolve_scope(scope, len(document["pages"]), document["outline"])
+            if resolved is None:
+                raise ScopeNotFoundError(f"No section or pages match {scope!r}")
+            page_range = resolved[:2]
+            context = get_scoped_text(document["pages"], *page_range)
+
+        keys = [(doc_id, page_range, question.strip(), model, mode) for question in questions]
+        answered = {}
+        for key in dict.fromkeys(keys):
+            if key in self.answers:
+                self.answers.move_to_end(key)
+                answered[key] = self.answers[key]
+            elif reuse_similar and key not in self.pending:
+                similar = self._find_similar_answer(key)
+                if similar is not None:
+                    answered[key] = similar
+        new_keys = [key for key in dict.fromkeys(keys) if key not in answered and key not in self.pending]
+        if len(new_keys) > self.queue_size:
+            raise BatchTooLargeError(
+                f"{len(new_keys)} new questions exceed the queue size of {self.queue_size}, split the batch"
+            )
+        if len(new_keys) > self.queue_size - self.queue.qsize():
+            raise QueueFullError(
+                f"{len(new_keys)} new questions do not fit, {self.queue.qsize()} of {self.queue_size} slots in use"
+            )
+
+        for key in new_keys:
+            future = loop.create_future()
+            self.pending[key] = future
+            self.queue.put_nowait((key, context, future))
+
+        waiters = []
+        for key in keys:
+            if key in answered:
+                done = loop.create_future()
+                done.set_result(answered[key])
+                waiters.append(done)
+            else:
+                # Shield so one disconnected client does not cancel a shared answer
+                waiters.append(asyncio.shield(self.pending[key]))
+        return waiters
+
+    def _find_similar_answer(self, key):
+        """Cached answer to a paraphrase of the question in key, or None"""
+        doc_id, page_range, question, model, mode = key
+        index = self.question_indexes.get((doc_id, page_range, model, mode))
+        match = index.find(question) if index else None
+        # The index stores answer cache keys, so evicted answers are not reused
+        if match is None or match["answer"] not in self.answers:
+            return None
+        return {
+            **self.answers[match["answer"]],
+            "matched_question": match["question"],
+            "similarity": round(match["similarity"], 3),
+        }
+
+    def _evict_oldest_answer(self):
+        """Drop the least recently used answer and its paraphrase index row"""
+        evicted_key, _ = self.answers.popitem(last=False)
+        doc_id, page_range, question, model, mode = evicted_key
+        index_key = (doc_id, page_range, model, mode)
+        index = self.question_indexes.get(index_key)
+        if index is not None:
+            index.remove(evicted_key)
+            if not len(index):
+                del self.question_indexes[index_key]
+
+    async def _worker(self):
+        """Answer queued questions one at a time"""
+        loop = asyncio.get_running_loop()
+        while True:
+            key, context, future = await self.queue.get()
+            doc_id, page_range, question, model, mode = key
+            try:
+                result = await loop.run_in_executor(self.executor, run_question, context, question, model, mode)
+                if result["confidence"] != "ERROR":
+                    self.answers[key] = result
+                    index = self.question_indexes.setdefault(
+                        (doc_id, page_range, model, mode), QuestionIndex(self.similarity_threshold)
+                    )
+                    index.add(question, key)
+                    while len(self.answers) > self.max_answers:
+                        self._evict_oldest_answer()
+                future.set_result(result)
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                self.pending.pop(key, None)
+                self.queue.task_done()
+
+    def stats(self):
+        """Current queue depth and cache sizes"""
+        return {
+            "workers": self.worker_count,
+            "queued": self.queue.qsize() if self.queue else 0,
+            "queue_size": self.queue_size,
+            "in_flight": len(self.pending),
+            "documents": len(self.documents),
+            "cached_answers": len(self.answers),
+            "indexed_questions": sum(len(index) for index in self.question_indexes.values()),
+        }
+
+
+def run_question(context, question, model, mode):
+    """Call the matching ask_groq_* function and return a dict result"""
+    result = ASK_FUNCTIONS[mode](context, question, model)
+    if mode == "basic":
+        # ask_groq_question returns plain text
+        confidence = "ERROR" if result.startswith("Error:") else "UNKNOWN"
+        result = {"answer": result, "confidence": confidence}
+    return result
+
+
+class AskRequest(BaseModel):
+    question: str
+    model: str = DEFAULT_MODEL
+    mode: str = "sources"
+    scope: Optional[str] = None
+    reuse_similar: bool = True
+
+
+class BatchRequest(BaseModel):
+    questions: List[str] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+    model: str = DEFAULT_MODEL
+    mode: str = "sources"
+    scope: Optional[str] = None
+    reuse_similar: bool = True
+
+
+qa_service = QAService(
+    workers=int(os.getenv("QA_WORKERS", "32")),
+    queue_size=int(os.getenv("QA_QUEUE_SIZE", "256")),
+    max_documents=int(os.getenv("QA_MAX_DOCUMENTS", "100")),
+    max_answers=int(os.getenv("QA_MAX_ANSWERS", "10000")),
+    similarity_threshold=float(os.getenv("QA_SIMILARITY_THRESHOLD", str(DEFAULT_THRESHOLD))),
+)
+
+
+@asynccontextmanager
+async def lifespan(api):
+    await qa_service.start()
+    yield
+    await qa_service.stop()
+
+
+api = FastAPI(title="PDF Question Answering with Groq", lifespan=lifespan)
+
+
+def _enqueue(doc_id, questions, model, mode, scope, reuse_similar):
+    """Validate a question request and queue it, mapping errors to HTTP codes"""
+    if doc_id not in qa_service.documents:
+        raise HTTPException(status_code=404, detail="Unknown document id")
+    if mode not in ASK_FUNCTIONS:
+        raise HTTPException(status_code=400, detail=f"Mode must be one of {sorted(ASK_FUNCTIONS)}")
+    if not questions or not all(question.strip() for question in questions):
+        raise HTTPException(status_code=400, detail="Please enter a question")
+    try:
+        return qa_service.enqueue_questions(doc_id, questions, model, mode, scope, reuse_similar)
+    except ScopeNotFoundError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except BatchTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=f"Server busy: {e}", headers={"Retry-After": "1"})
+
+
+@api.get("/health")
+async def health():
+    return qa_service.stats()
+
+
+@api.post("/documents")
+async def upload_document(request: Request):
+    """Upload a PDF as the raw request body"""
+    too_large = HTTPException(status_code=413, detail=f"PDF must be at most {MAX_UPLOAD_BYTES // (1024 * 1024)} MB")
+    if int(request.headers.get("content-length") or 0) > MAX_UPLOAD_BYTES:
+        raise too_large
+    # Read in chunks so a body without Content-Length cannot exhaust memory
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > MAX_UPLOAD_BYTES:
+            raise too_large
+        chunks.append(chunk)
+    pdf_bytes = b"".join(chunks)
+    if not pdf_bytes:
+        raise HTTPException(status_code=400, detail="Request body must contain a PDF file")
+    doc_id = await qa_service.add_document(pdf_bytes)
+    if doc_id is None:
+        raise HTTPException(status_code=400, detail="Failed to extract text from PDF")
+    document = qa_service.documents[doc_id]
+    return {"doc_id": doc_id, "characters": len(document["text"]), "pages": len(document["pages"])}
+
+
+@api.get("/documents/{doc_id}/outline")
+async def get_outline(doc_id: str):
+    """Sections and page ranges that can be used as a question scope"""
+    if doc_id not in qa_service.documents:
+        raise HTTPException(status_code=404, detail="Unknown document id")
+    return {"doc_id": doc_id, "outline": qa_service.documents[doc_id]["outline"]}
+
+
+@api.post("/documents/{doc_id}/ask")
+async def ask(doc_id: str, body: AskRequest):
+    waiters = _enqueue(doc_id, [body.question], body.model, body.mode, body.scope, body.reuse_similar)
+    result = await waiters[0]
+    return {"question": body.question, "model": body.model, "mode": body.mode, "scope": body.scope, **result}
+
+
+@api.post("/documents/{doc_id}/batch")
+async def ask_batch(doc_id: str, body: BatchRequest):
+    waiters = _enqueue(doc_id, body.questions, body.model, body.mode, body.scope, body.reuse_similar)
+    results = await asyncio.gather(*waiters)
+    return {
+        "model": body.model,
+        "mode": body.mode,
+        "scope": body.scope,
+        "answers": [{"question": question, **result} for question, result in zip(body.questions, results)],
+    }
+
+
+@api.post("/documents/{doc_id}/stream")
+async def ask_stream(doc_id: str, body: BatchRequest):
+    """Stream answers as server-sent events in the order they complete"""
+    # Queue before the response starts so a full queue still gets a real 429
+    waiters = _enqueue(doc_id, body.questions, body.model, body.mode, body.scope, body.reuse_similar)
+
+    async def indexed(index, waiter):
+        return index, await waiter
+
+    async def events():
+        for next_done in asyncio.as_completed([indexed(i, w) for i, w in enumerate(waiters)]):
+            index, result = await next_done
+            payload = {"index": index, "question": body.questions[index], **result}
+            yield f"event: answer\ndata: {json.dumps(payload)}\n\n"
+        yield "event: done\ndata: {}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(api, host=os.getenv("QA_HOST", "0.0.0.0"), port=int(os.getenv("QA_PORT", "8000")))
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Test script for the document outline index and question scopes
+
+Runs offline (no GROQ_API_KEY needed). Fixture PDFs are generated with
+fake_groq.make_pdf.
+"""
+
+import io
+import os
+
+from PyPDF2 import PdfReader, PdfWriter
+
+# app.py needs an API key at import time; these tests never call Groq
+os.environ.setdefault("GROQ_API_KEY", "offline-test")
+
+from fake_groq import make_pdf
+from app import extract_pdf_document, get_scoped_text, resolve_scope
+
+BODY = "This paragraph is ordinary body text that explains the section in some detail."
+
+
+def outline_of(pages):
+    """Outline entries as (title, start_page, end_page) for a generated PDF"""
+    document = extract_pdf_document(io.BytesIO(make_pdf(pages)))
+    return [(entry["title"], entry["start_page"], entry["end_page"]) for entry in document["outline"]]
+
+
+def test_bookmark_outline():
+    """Test that PDF bookmarks build a nested outline with section page ranges"""
+    print("🧪 Testing bookmark outline...")
+
+    writer = PdfWriter()
+    for page in PdfReader(io.BytesIO(make_pdf([f"Page {i + 1}" for i in range(8)]))).pages:
+        writer.add_page(page)
+    intro = writer.add_outline_item("Section 1: Introduction", 0)
+    writer.add_outline_item("1.1 Scope", 1, parent=intro)
+    writer.add_outline_item("Section 2: Results", 3)
+    writer.add_outline_item("Appendix A", 7)
+    pdf = io.BytesIO()
+    writer.write(pdf)
+    pdf.seek(0)
+
+    outline = extract_pdf_document(pdf)["outline"]
+    entries = [(entry["title"], entry["number"], entry["level"], entry["start_page"], entry["end_page"])
+               for entry in outline]
+    for entry in entries:
+        print(f"✅ {entry}")
+    # Bookmarks do not say where on the page a section starts, so the next start page is included
+    assert entries == [
+        ("Section 1: Introduction", "1", 1, 1, 4),
+        ("1.1 Scope", "1.1", 2, 2, 4),
+        ("Section 2: Results", "2", 1, 4, 8),
+        ("Appendix A", "A", 1, 8, 8),
+    ]
+    assert resolve_scope("Section 2", 8, outline)[:2] == (4, 8)
+    assert resolve_scope("section 1.1", 8, outline)[:2] == (2, 4)
+    assert resolve_scope("appendix a", 8, outline)[:2] == (8, 8)
+
+
+def test_heading_outline():
+    """Test detected headings and section end pages"""
+    print("\n🧪 Testing heading outline...")
+
+    outline = outline_of([
+        "Annual Security Report",
+        f"1 Introduction\n{BODY}",
+        f"{BODY}\n2 Methods\n{BODY}",
+        f"2.1 Sampling\n{BODY}",
+        f"{BODY}",
+        f"3 Results\n{BODY}",
+    ])
+    for entry in outline:
+        print(f"✅ {entry}")
+    # Sections that start at the top of a page end on the page before; mid-page starts share the page
+    assert outline == [
+        ("1 Introduction", 2, 3),
+        ("2 Methods", 3, 5),
+        ("2.1 Sampling", 4, 5),
+        ("3 Results", 6, 6),
+    ]
+
+
+def test_table_of_contents_skipped():
+    """Test that table of contents lines and pages are not taken as headings"""
+    print("\n🧪 Testing table of contents handling...")
+
+    sections = [f"1 Introduction\n{BODY}", f"2 Methods\n{BODY}", f"3 Results\n{BODY}"]
+    with_page_numbers = outline_of(["Contents\n1 Introduction 2\n2 Methods 3\n3 Results 4"] + sections)
+    without_page_numbers = outline_of(["1 Introduction\n2 Methods\n3 Results"] + sections)
+    print(f"✅ TOC with page numbers: {with_page_numbers}")
+    print(f"✅ TOC without page numbers: {without_page_numbers}")
+
+    expected = [("1 Introduction", 2, 2), ("2 Methods", 3, 3), ("3 Results", 4, 4)]
+    assert with_page_numbers == expected
+    assert without_page_numbers == expected
+
+
+def test_running_footers_skipped():
+    """Test that numbered footers and repeated headers do not become sections"""
+    print("\n🧪 Testing running headers and footers...")
+
+    body = "\n".join([BODY] * 4)
+    outline = outline_of([
+        f"Chapter 1 Overview\n1.1 Introduction\n{body}\n2 Annual Report",
+        f"Chapter 1 Overview\n{body}\n3 Annual Report",
+        f"Chapter 1 Overview\n1.2 Methods\n{body}\n4 Annual Report",
+    ])
+    for entry in outline:
+        print(f"✅ {entry}")
+    assert outline == [
+        ("Chapter 1 Overview", 1, 3),
+        ("1.1 Introduction", 1, 3),
+        ("1.2 Methods", 3, 3),
+    ]
+
+
+def test_sentences_not_headings():
+    """Test that a sentence starting with "Section N" does not replace the real heading"""
+    print("\n🧪 Testing sentences that mention sections...")
+
+    outline = outline_of([
+        f"1 Introduction\n{BODY}\nSection 3 presents the results of the survey.\n{BODY}",
+        f"2 Methods\n{BODY}",
+        f"{BODY}",
+        f"3 Results\n{BODY}",
+    ])
+    for entry in outline:
+        print(f"✅ {entry}")
+    assert outline == [("1 Introduction", 1, 1), ("2 Methods", 2, 3), ("3 Results", 4, 4)]
+
+
+def test_repeated_subsection_titles():
+    """Test that subsection titles reused in every chapter are kept"""
+    print("\n🧪 Testing repeated subsection titles...")
+
+    pages = [
+        f"Chapter 1 Planning\n1.1 Overview\n{BODY}",
+        f"1.2 Summary\n{BODY}",
+        f"{BODY}",
+        f"Chapter 2 Delivery\n2.1 Overview\n{BODY}",
+        f"2.2 Summary\n{BODY}",
+        f"{BODY}",
+    ]
+    document = extract_pdf_document(io.BytesIO(make_pdf(pages)))
+    outline = [(entry["title"], entry["start_page"], entry["end_page"]) for entry in document["outline"]]
+    for entry in outline:
+        print(f"✅ {entry}")
+    assert outline == [
+        ("Chapter 1 Planning", 1, 3),
+        ("1.1 Overview", 1, 1),
+        ("1.2 Summary", 2, 3),
+        ("Chapter 2 Delivery", 4, 6),
+        ("2.1 Overview", 4, 4),
+        ("2.2 Summary", 5, 6),
+    ]
+    assert resolve_scope("Section 2.2", len(pages), document["outline"])[:2] == (5, 6)
+
+
+def test_titles_ending_in_numbers():
+    """Test that heading titles ending in a small number are not taken for TOC lines"""
+    print("\n🧪 Testing titles ending in numbers...")
+
+    pages = [f"Chapter 1 Planning\n{BODY}", f"{BODY}", f"Chapter 2 Phase 1\n{BODY}", f"Chapter 3 Phase 2\n{BODY}"]
+    document = extract_pdf_document(io.BytesIO(make_pdf(pages)))
+    outline = [(entry["title"], entry["start_page"], entry["end_page"]) for entry in document["outline"]]
+    for entry in outline:
+        print(f"✅ {entry}")
+    assert outline == [("Chapter 1 Planning", 1, 2), ("Chapter 2 Phase 1", 3, 3), ("Chapter 3 Phase 2", 4, 4)]
+    assert resolve_scope("Chapter 2", len(pages), document["outline"])[:2] == (3, 3)
+
+
+def test_page_scopes():
+    """Test page range scopes"""
+    print("\n🧪 Testing page scopes...")
+
+    cases = [
+        ("pages 40-55", 60, (40, 55, "pages 40-55")),
+        ("Pages 40 to 55", 60, (40, 55, "pages 40-55")),
+        ("p. 3-5", 10, (3, 5, "pages 3-5")),
+        ("pp. 5-3", 10, (3, 5, "pages 3-5")),
+        ("page 12", 20, (12, 12, "page 12")),
+        ("40-55", 60, (40, 55, "pages 40-55")),
+        ("7", 10, (7, 7, "page 7")),
+        ("pages 8-30", 10, (8, 10, "pages 8-10")),
+        ("page 11", 10, None),
+        ("page 0", 10, None),
+        ("Section 9", 10, None),
+    ]
+    for scope, page_count, expected in cases:
+        result = resolve_scope(scope, page_count, [])
+        print(f"✅ {scope!r} of {page_count} pages -> {result}")
+        assert result == expected, (scope, result)
+
+
+def test_scoped_text():
+    """Test that scoped text contains exactly the requested pages"""
+    print("\n🧪 Testing scoped text...")
+
+    pages = ["page one", "page two", "page three", "page four"]
+    assert get_scoped_text(pages, 2, 3) == "page two\npage three\n"
+    assert get_scoped_text(pages, 4, 4) == "page four\n"
+    assert get_scoped_text(pages, 1, 4) == "".join(page + "\n" for page in pages)
+    print("✅ Page slicing matches the requested ranges")
+
+
+def main():
+    print("📑 Testing Document Outline and Scopes")
+    print("=" * 50)
+
+    results = []
+    for test in [test_bookmark_outline, test_heading_outline, test_table_of_contents_skipped,
+                 test_running_footers_skipped, test_sentences_not_headings, test_repeated_subsection_titles,
+                 test_titles_ending_in_numbers, test_page_scopes, test_scoped_text]:
+        try:
+            test()
+            results.append(True)
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+            results.append(False)
+
+    print("\n" + "=" * 50)
+    if all(results):
+        print("🎉 All outline tests passed!")
+    else:
+        print("❌ Some tests failed. Please check the outline index.")
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Test script to measure near-duplicate question matching on labelled pairs
+
+Runs offline (no GROQ_API_KEY needed). paraphrase_pairs.jsonl is split in
+two: the "tune" pairs were used to build the synonym table and to pick the
+threshold (the one with the best F0.5 score, which favours precision because
+a wrong reused answer costs more than an extra Groq call), and the "holdout"
+pairs were written separately and are only used to report precision and
+recall. Do not adjust the matcher based on holdout results; add the failing
+cases to the tune split instead and write new holdout pairs.
+"""
+
+import json
+import os
+
+from question_index import DEFAULT_THRESHOLD, QuestionIndex, question_similarity
+
+PAIRS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "paraphrase_pairs.jsonl")
+
+# Held-out bars, fixed before the holdout pairs were first scored
+MIN_PRECISION = 0.9
+MIN_RECALL = 0.4
+
+
+def load_pairs(split, path=PAIRS_FILE):
+    """Load labelled question pairs (label 1 = same question) from one split"""
+    with open(path) as f:
+        pairs = [json.loads(line) for line in f if line.strip()]
+    return [pair for pair in pairs if pair["split"] == split]
+
+
+def score_pairs(pairs):
+    """Similarity and label for every pair"""
+    return [(question_similarity(pair["question_a"], pair["question_b"]), pair["label"]) for pair in pairs]
+
+
+def evaluate(scores, threshold):
+    """Precision, recall and F0.5 of matching at a threshold"""
+    tp = sum(1 for score, label in scores if score >= threshold and label)
+    fp = sum(1 for score, label in scores if score >= threshold and not label)
+    fn = sum(1 for score, label in scores if score < threshold and label)
+    precision = tp / (tp + fp) if tp + fp else 1.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f_half = 1.25 * precision * recall / (0.25 * precision + recall) if precision + recall else 0.0
+    return {"threshold": threshold, "precision": precision, "recall": recall, "f0.5": f_half,
+            "true_positives": tp, "false_positives": fp, "false_negatives": fn}
+
+
+def tune_threshold(scores):
+    """Threshold with the best F0.5 score, preferring the higher one on ties"""
+    results = [evaluate(scores, step / 100) for step in range(30, 100)]
+    return max(results, key=lambda result: (round(result["f0.5"], 6), result["threshold"]))
+
+
+def test_matcher_precision_recall():
+    """Test precision and recall on held-out pairs at the default threshold"""
+    print("🧪 Testing matcher precision/recall on held-out pairs...")
+
+    pairs = load_pairs("holdout")
+    result = evaluate(score_pairs(pairs), DEFAULT_THRESHOLD)
+
+    print(f"✅ Pairs: {len(pairs)} ({sum(pair['label'] for pair in pairs)} paraphrases)")
+    print(f"✅ Threshold: {DEFAULT_THRESHOLD}")
+    print(f"✅ Precision: {result['precision']:.3f} ({result['false_positives']} false matches)")
+    print(f"✅ Recall: {result['recall']:.3f} ({result['false_negatives']} missed paraphrases)")
+
+    assert result["precision"] >= MIN_PRECISION, f"precision {result['precision']:.3f} below {MIN_PRECISION}"
+    assert result["recall"] >= MIN_RECALL, f"recall {result['recall']:.3f} below {MIN_RECALL}"
+
+
+def test_threshold_is_tuned():
+    """Test that the default threshold matches the best one on the tune pairs"""
+    print("\n🧪 Testing threshold tuning on tune pairs...")
+
+    scores = score_pairs(load_pairs("tune"))
+    best = tune_threshold(scores)
+    current = evaluate(scores, DEFAULT_THRESHOLD)
+
+    print(f"✅ Best threshold: {best['threshold']:.2f} "
+          f"(precision {best['precision']:.3f}, recall {best['recall']:.3f}, F0.5 {best['f0.5']:.3f})")
+    print(f"✅ Default threshold: {DEFAULT_THRESHOLD:.2f} (F0.5 {current['f0.5']:.3f})")
+
+    assert current["f0.5"] >= best["f0.5"] - 0.02, "DEFAULT_THRESHOLD should be re-tuned"
+
+
+def test_index_lookup():
+    """Test that the index returns stored answers for paraphrases only"""
+    print("\n🧪 Testing question index lookup...")
+
+    index = QuestionIndex()
+    index.add("What is the main topic of this document?", {"answer": "Climate change"})
+    index.add("What was the revenue in 2022?", {"answer": "$10M"})
+
+    paraphrase = index.find("what's the doc about")
+    print(f"✅ Paraphrase match: {paraphrase and paraphrase['question']}")
+    assert paraphrase and paraphrase["answer"]["answer"] == "Climate change"
+
+    other_year = index.find("What was the revenue in 2023?")
+    print(f"✅ Different year match: {other_year and other_year['question']}")
+    assert other_year is None
+
+    unrelated = index.find("Who is the author?")
+    print(f"✅ Unrelated match: {unrelated and unrelated['question']}")
+    assert unrelated is None
+
+
+def test_signature_mismatches():
+    """Test that questions differing only in an identifier, period, ordinal or ask never match"""
+    print("\n🧪 Testing signature mismatches...")
+
+    pairs = [
+        ("What are the risks of option A?", "What are the risks of option B?"),
+        ("What was revenue last year?", "What was revenue this year?"),
+        ("What are the risks of the project?", "How can we reduce the risks of the project?"),
+        ("What happens in phase one?", "What happens in phase two?"),
+        ("What happens in the first phase?", "What happens in the second phase?"),
+    ]
+    for first, second in pairs:
+        score = question_similarity(first, second)
+        print(f"✅ {first!r} vs {second!r}: {score:.2f}")
+        assert score == 0.0, (first, second, score)
+
+    score = question_similarity("What happens in phase one?", "What happens in phase 1?")
+    print(f"✅ 'phase one' vs 'phase 1': {score:.2f}")
+    assert score >= DEFAULT_THRESHOLD
+
+
+def test_index_capacity():
+    """Test that a full index overwrites its oldest row and reuses removed rows"""
+    print("\n🧪 Testing question index capacity...")
+
+    index = QuestionIndex(max_entries=3)
+    for year in range(2020, 2024):
+        index.add(f"What was the revenue in {year}?", year)
+    print(f"✅ Entries after 4 adds to a 3-row index: {len(index)}")
+    assert len(index) == 3 and len(index.vectors) == 3
+    assert index.find("What was the revenue in 2020?") is None
+    assert index.find("What was the revenue in 2023?")["answer"] == 2023
+
+    index.remove(2021)
+    assert len(index) == 2 and index.find("What was the revenue in 2021?") is None
+    index.add("Who is the author?", "author")
+    print(f"✅ Entries after remove and add: {len(index)}")
+    assert len(index) == 3 and len(index.vectors) == 3
+    assert index.find("Who wrote the document?")["answer"] == "author"
+    assert index.find("What was the revenue in 2022?")["answer"] == 2022
+
+
+def main():
+    print("🔍 Testing Near-Duplicate Question Matching")
+    print("=" * 50)
+
+    results = []
+    for test in [test_matcher_precision_recall, test_threshold_is_tuned, test_index_lookup,
+                 test_signature_mismatches, test_index_capacity]:
+        try:
+            test()
+            results.append(True)
+        except AssertionError as e:
+            print(f"❌ {e}")
+            results.append(False)
+
+    print("\n" + "=" * 50)
+    if all(results):
+        print("🎉 All question matching tests passed!")
+    else:
+        print("❌ Some tests failed. Please check the matcher or re-tune the threshold.")
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    main()
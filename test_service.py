@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Test script for the HTTP service
+
+Runs offline (no GROQ_API_KEY needed): app.client is replaced with the
+fake Groq backend from fake_groq.py and requests go through httpx.ASGITransport.
+"""
+
+import asyncio
+import json
+
+import os
+
+import httpx
+
+# app.py needs an API key at import time; the fake Groq backend never uses it
+os.environ.setdefault("GROQ_API_KEY", "offline-test")
+
+from fake_groq import FakeGroqClient, make_pdf
+import app
+import service
+
+
+def run_with_client(test, latency=0.05, **service_options):
+    """Run test(client) against a fresh QAService behind the FastAPI app"""
+    app.client = FakeGroqClient(median_latency=latency, sigma=0.1, seed=0)
+    service.qa_service = service.QAService(**{"workers": 2, "queue_size": 4, **service_options})
+
+    async def runner():
+        async with service.lifespan(service.api):
+            transport = httpx.ASGITransport(app=service.api)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                await test(client)
+
+    asyncio.run(runner())
+
+
+async def upload(client, text="Report on climate change."):
+    response = await client.post("/documents", content=make_pdf([text]))
+    assert response.status_code == 200, response.text
+    return response.json()["doc_id"]
+
+
+def test_upload_dedup():
+    """Test that uploading the same PDF twice returns the same content-hash id"""
+    print("🧪 Testing upload and dedup by hash...")
+
+    async def test(client):
+        first = await upload(client)
+        second = await upload(client)
+        other = await upload(client, "A different report.")
+        print(f"✅ Document id: {first[:16]}...")
+        assert first == second and first != other
+        assert len(service.qa_service.documents) == 2
+
+        empty = await client.post("/documents", content=b"")
+        not_pdf = await client.post("/documents", content=b"not a pdf")
+        print(f"✅ Empty body: {empty.status_code}, invalid PDF: {not_pdf.status_code}")
+        assert empty.status_code == 400 and not_pdf.status_code == 400
+
+    run_with_client(test)
+
+
+def test_document_eviction():
+    """Test that documents are evicted least recently used, counting questions as a use"""
+    print("\n🧪 Testing document eviction...")
+
+    async def test(client):
+        first = await upload(client, "First report.")
+        second = await upload(client, "Second report.")
+        response = await client.post(f"/documents/{first}/ask", json={"question": "What is this?"})
+        assert response.status_code == 200
+        third = await upload(client, "Third report.")
+        kept = list(service.qa_service.documents)
+        print(f"✅ Kept documents: {[doc_id[:8] for doc_id in kept]}")
+        assert kept == [first, third] and second not in kept
+
+    run_with_client(test, max_documents=2)
+
+
+def test_upload_size_limit():
+    """Test that oversized uploads are rejected"""
+    print("\n🧪 Testing upload size limit...")
+
+    async def test(client):
+        limit = service.MAX_UPLOAD_BYTES
+        service.MAX_UPLOAD_BYTES = 1024
+        try:
+            response = await client.post("/documents", content=make_pdf(["x" * 4000]))
+        finally:
+            service.MAX_UPLOAD_BYTES = limit
+        print(f"✅ Oversized upload: {response.status_code}")
+        assert response.status_code == 413
+
+    run_with_client(test)
+
+
+def test_error_paths():
+    """Test 404 and 400 responses"""
+    print("\n🧪 Testing error paths...")
+
+    async def test(client):
+        doc_id = await upload(client)
+        cases = [
+            ("/documents/unknown/ask", {"question": "What is this?"}, 404),
+            (f"/documents/{doc_id}/ask", {"question": "   "}, 400),
+            (f"/documents/{doc_id}/ask", {"question": "What is this?", "mode": "poetry"}, 400),
+            (f"/documents/{doc_id}/ask", {"question": "What is this?", "scope": "Section 9"}, 400),
+            (f"/documents/{doc_id}/batch", {"questions": []}, 422),
+            (f"/documents/{doc_id}/batch", {"questions": ["q"] * (service.MAX_BATCH_SIZE + 1)}, 422),
+        ]
+        for path, body, expected in cases:
+            response = await client.post(path, json=body)
+            print(f"✅ {path.split('/')[-1]} {body}: {response.status_code}"[:100])
+            assert response.status_code == expected, (body, response.text)
+        assert (await client.get("/documents/unknown/outline")).status_code == 404
+
+    run_with_client(test)
+
+
+def test_backpressure():
+    """Test 429 when the queue is full and 413 when a batch can never fit"""
+    print("\n🧪 Testing backpressure...")
+
+    async def test(client):
+        doc_id = await upload(client)
+
+        oversized = await client.post(f"/documents/{doc_id}/batch", json={"questions": [f"Q{i}?" for i in range(6)]})
+        print(f"✅ Batch larger than the queue: {oversized.status_code}")
+        assert oversized.status_code == 413
+
+        # Two questions go to the workers and four fill the queue, so the next one must wait
+        busy = asyncio.create_task(
+            client.post(f"/documents/{doc_id}/batch", json={"questions": [f"Busy {i}?" for i in range(4)]})
+        )
+        await asyncio.sleep(0.01)
+        more = asyncio.create_task(
+            client.post(f"/documents/{doc_id}/batch", json={"questions": ["More 1?", "More 2?"]})
+        )
+        await asyncio.sleep(0.01)
+        rejected = await client.post(f"/documents/{doc_id}/ask", json={"question": "Late?"})
+        print(f"✅ Saturated queue: {rejected.status_code}, Retry-After: {rejected.headers.get('retry-after')}")
+        assert rejected.status_code == 429 and rejected.headers.get("retry-after") == "1"
+        assert (await busy).status_code == 200 and (await more).status_code == 200
+
+    run_with_client(test, latency=0.5)
+
+
+def test_in_flight_dedup():
+    """Test that concurrent identical questions share one Groq call and the cache"""
+    print("\n🧪 Testing in-flight dedup...")
+
+    async def test(client):
+        doc_id = await upload(client)
+        body = {"question": "What is the main topic?", "reuse_similar": False}
+        responses = await asyncio.gather(*(client.post(f"/documents/{doc_id}/ask", json=body) for _ in range(5)))
+        print(f"✅ Groq calls for 5 concurrent identical questions: {app.client.calls}")
+        assert all(response.status_code == 200 for response in responses)
+        assert app.client.calls == 1
+
+        await client.post(f"/documents/{doc_id}/ask", json=body)
+        print(f"✅ Groq calls after a cached repeat: {app.client.calls}")
+        assert app.client.calls == 1
+
+    run_with_client(test)
+
+
+def test_question_index_bounded():
+    """Test that paraphrase index rows are dropped with their evicted answers"""
+    print("\n🧪 Testing question index eviction...")
+
+    async def test(client):
+        doc_id = await upload(client)
+        for question in ["Who wrote it?", "When was it published?", "How much did it cost?", "Where is it based?"]:
+            await client.post(f"/documents/{doc_id}/ask", json={"question": question})
+        stats = (await client.get("/health")).json()
+        print(f"✅ Cached answers: {stats['cached_answers']}, indexed questions: {stats['indexed_questions']}")
+        assert stats["cached_answers"] == 2 and stats["indexed_questions"] == 2
+
+        # The evicted answer can no longer be reused through a paraphrase
+        response = await client.post(f"/documents/{doc_id}/ask", json={"question": "Who is the author?"})
+        assert "matched_question" not in response.json()
+
+    run_with_client(test, max_answers=2)
+
+
+def test_sse_stream():
+    """Test server-sent event framing of streamed answers"""
+    print("\n🧪 Testing SSE stream...")
+
+    async def test(client):
+        doc_id = await upload(client)
+        questions = ["What is the topic?", "Who wrote it?"]
+        response = await client.post(f"/documents/{doc_id}/stream", json={"questions": questions})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = [block for block in response.text.split("\n\n") if block]
+        names = [block.split("\n")[0] for block in events]
+        payloads = [json.loads(block.split("\n")[1][len("data: "):]) for block in events]
+        print(f"✅ Events: {names}")
+        assert names == ["event: answer", "event: answer", "event: done"]
+        assert sorted(payload["index"] for payload in payloads[:2]) == [0, 1]
+        assert all(payload["question"] == questions[payload["index"]] for payload in payloads[:2])
+        assert payloads[2] == {}
+
+    run_with_client(test)
+
+
+def main():
+    print("🌐 Testing HTTP Service")
+    print("=" * 50)
+
+    results = []
+    for test in [test_upload_dedup, test_document_eviction, test_upload_size_limit, test_error_paths, test_backpressure,
+                 test_in_flight_dedup, test_question_index_bounded, test_sse_stream]:
+        try:
+            test()
+            results.append(True)
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+            results.append(False)
+
+    print("\n" + "=" * 50)
+    if all(results):
+        print("🎉 All service tests passed!")
+    else:
+        print("❌ Some tests failed. Please check the service.")
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    main()